@@ -13,6 +13,7 @@ import sys
 import logging
 import argparse
 from pathlib import Path
+from typing import List, Optional
 import traceback
 
 # Add src directory to Python path for package imports
@@ -60,10 +61,13 @@ def setup_logging(log_level: str = 'INFO', log_file: str = None) -> None:
     logging.getLogger('PIL').setLevel(logging.WARNING)
 
 
-def parse_arguments() -> argparse.Namespace:
+def parse_arguments(argv: Optional[List[str]] = None) -> argparse.Namespace:
     """
     Parse command line arguments
     
+    Args:
+        argv: Argument list (defaults to sys.argv[1:])
+        
     Returns:
         Parsed arguments namespace
     """
@@ -135,7 +139,7 @@ Examples:
     parser.add_argument('--verbose', '-v', action='store_true',
                        help='Enable verbose output')
     
-    return parser.parse_args()
+    return parser.parse_args(argv)
 
 
 def generate_sample_config() -> None:
@@ -177,9 +181,15 @@ def validate_configuration(config_path: str) -> None:
         sys.exit(1)
 
 
-def main():
-    """Main analysis pipeline"""
-    args = parse_arguments()
+def main(argv: Optional[List[str]] = None):
+    """
+    Main analysis pipeline
+    
+    Args:
+        argv: Argument list (defaults to sys.argv[1:]); lets callers run the
+            pipeline in-process instead of starting a new interpreter
+    """
+    args = parse_arguments(argv)
     
     # Handle utility commands
     if args.generate_config:
@@ -263,7 +273,7 @@ def main():
                 
                 # Step 2: Prepare ligands using MGLTools
                 logger.info("Preparing ligands with MGLTools...")
-                ligand_files = docking_wrapper.prepare_ligands(df)
+                ligand_files = docking_wrapper.prepare_ligands(df, processor.mols)
                 
                 if ligand_files and receptor_file:
                     # Step 3: Run docking with prepared files
@@ -292,7 +302,7 @@ def main():
         
         # Prepare visualization data
         logger.info("Preparing visualization data...")
-        data_points = processor.prepare_visualization_data()
+        data_points = processor.prepare_visualization_columns()
         data_summary = processor.get_data_summary()
         
         # Generate dashboard
@@ -309,13 +319,11 @@ def main():
             export_file = args.export_file or config.get('export.export_file', 'analysis_results.csv')
             logger.info(f"Exporting processed data to: {export_file}")
             
-            # Remove Mol column before export (not serializable)
-            export_df = df.drop(columns=['Mol'], errors='ignore')
-            export_df.to_csv(export_file, index=False)
+            df.to_csv(export_file, index=False)
         
         # Print summary
         logger.info("=== Analysis Complete ===")
-        logger.info(f"📊 Processed {len(data_points)} compounds")
+        logger.info(f"📊 Processed {len(data_points['id'])} compounds")
         logger.info(f"🧪 {len(data_summary.get('available_properties', []))} properties analyzed")
         logger.info(f"📈 Dashboard saved to: {output_file}")
         
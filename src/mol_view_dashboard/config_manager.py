@@ -6,10 +6,50 @@ Handles YAML configuration loading, validation, and default settings
 
 import yaml
 import os
+import copy
+import json
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 import logging
 
+# Prefer the libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+# Parsed YAML files keyed by resolved path -> (mtime_ns, parsed config)
+_yaml_cache: Dict[str, Tuple[int, Any]] = {}
+
+# Optional JSON-Schema compiler (falls back to manual section checks)
+try:
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
+
+# Validator compiled on first use by _get_schema_validator (None if unavailable)
+_validate_schema = None
+_schema_compiled = False
+
+# Sentinels for the value cache: not yet cached / key absent from config
+_MISSING = object()
+_MISSING_KEY = object()
+
+def _get_schema_validator():
+    """Compile the configuration schema once, returning None if it cannot be used"""
+    global _validate_schema, _schema_compiled
+    
+    if not _schema_compiled:
+        _schema_compiled = True
+        if fastjsonschema is not None:
+            try:
+                with open(Path(__file__).with_name('config_schema.json'), 'r', encoding='utf-8') as f:
+                    _validate_schema = fastjsonschema.compile(json.load(f))
+            except (OSError, json.JSONDecodeError, fastjsonschema.JsonSchemaDefinitionException) as e:
+                logging.getLogger(__name__).warning(f"Configuration schema unavailable, "
+                                                    f"checking required sections only: {e}")
+    return _validate_schema
+
 class ConfigurationError(Exception):
     """Custom exception for configuration-related errors"""
     pass
@@ -28,6 +68,10 @@ class ConfigManager:
         self.config_path = config_path
         self.logger = logging.getLogger(__name__)
         
+        # Dot-path lookup caches (cleared whenever the configuration changes)
+        self._path_cache: Dict[str, tuple] = {}
+        self._value_cache: Dict[str, Any] = {}
+        
         if config_path:
             self.load_config(config_path)
         else:
@@ -51,8 +95,20 @@ class ConfigManager:
             if not config_file.exists():
                 raise ConfigurationError(f"Configuration file not found: {config_path}")
             
-            with open(config_file, 'r', encoding='utf-8') as f:
-                self.config = yaml.safe_load(f)
+            # Reuse the parsed file while it is unchanged on disk
+            cache_key = str(config_file.resolve())
+            mtime_ns = config_file.stat().st_mtime_ns
+            cached = _yaml_cache.get(cache_key)
+            if cached is not None and cached[0] == mtime_ns:
+                parsed = cached[1]
+            else:
+                with open(config_file, 'r', encoding='utf-8') as f:
+                    parsed = yaml.load(f, Loader=SafeLoader)
+                _yaml_cache[cache_key] = (mtime_ns, parsed)
+            
+            # Copy so that set() on this instance never leaks into the cache
+            self.config = copy.deepcopy(parsed)
+            self._value_cache.clear()
             
             self.logger.info(f"Configuration loaded from: {config_path}")
             self._validate_config()
@@ -74,6 +130,7 @@ class ConfigManager:
             },
             'analysis': {
                 'calculate_descriptors': True,
+                'fast_parse': False,
                 'chemical_space': {
                     'pca': {'enabled': True, 'n_components': 2},
                     'tsne': {'enabled': True, 'n_components': 2, 'perplexity': 30, 'random_state': 42}
@@ -98,6 +155,7 @@ class ConfigManager:
             'visualization': {
                 'output_file': 'molecular_analysis_dashboard.html',
                 'title': 'Molecular Visualization and Analysis',
+                'quantize_structure_images': False,
                 'property_plots': {
                     'primary_plot': {
                         'x_axis': 'MW',
@@ -111,7 +169,8 @@ class ConfigManager:
                 },
                 'docking_plots': {
                     'pose_viewer': 'ngl',
-                    'show_interactions': True
+                    'show_interactions': True,
+                    'external_receptor': False
                 },
                 'style': {
                     'color_scheme': 'viridis',
@@ -131,6 +190,7 @@ class ConfigManager:
                 'n_jobs': -1,
                 'chunk_size': 1000,
                 'cache_calculations': True,
+                'cache_ligand_embeddings': False,
                 'cache_dir': '.cache'
             },
             'advanced': {
@@ -144,6 +204,7 @@ class ConfigManager:
                 'log_file': 'analysis.log'
             }
         }
+        self._value_cache.clear()
         
         self.logger.info("Default configuration loaded")
         return self.config
@@ -158,11 +219,18 @@ class ConfigManager:
         if not self.config:
             raise ConfigurationError("No configuration loaded")
         
-        # Check required sections
-        required_sections = ['input', 'analysis', 'visualization']
-        for section in required_sections:
-            if section not in self.config:
-                raise ConfigurationError(f"Missing required configuration section: {section}")
+        # Check structure against the schema, or required sections only
+        validate_schema = _get_schema_validator()
+        if validate_schema is not None:
+            try:
+                validate_schema(self.config)
+            except fastjsonschema.JsonSchemaException as e:
+                raise ConfigurationError(f"Invalid configuration: {e.message}")
+        else:
+            required_sections = ['input', 'analysis', 'visualization']
+            for section in required_sections:
+                if section not in self.config:
+                    raise ConfigurationError(f"Missing required configuration section: {section}")
         
         # Validate input section
         input_config = self.config.get('input', {})
@@ -209,6 +277,9 @@ class ConfigManager:
         """
         Get configuration value using dot notation
         
+        Resolved values are memoized per key path until the configuration is
+        changed through set() or reloaded.
+        
         Args:
             key_path: Dot-separated key path (e.g., 'analysis.chemical_space.pca.enabled')
             default: Default value if key not found
@@ -219,15 +290,23 @@ class ConfigManager:
         if not self.config:
             return default
         
-        keys = key_path.split('.')
-        value = self.config
+        value = self._value_cache.get(key_path, _MISSING)
+        if value is not _MISSING:
+            return default if value is _MISSING_KEY else value
         
+        keys = self._path_cache.get(key_path)
+        if keys is None:
+            keys = self._path_cache.setdefault(key_path, tuple(key_path.split('.')))
+        
+        value = self.config
         for key in keys:
             if isinstance(value, dict) and key in value:
                 value = value[key]
             else:
+                self._value_cache[key_path] = _MISSING_KEY
                 return default
         
+        self._value_cache[key_path] = value
         return value
     
     def set(self, key_path: str, value: Any) -> None:
@@ -240,6 +319,7 @@ class ConfigManager:
         """
         if not self.config:
             self.config = {}
+        self._value_cache.clear()
         
         keys = key_path.split('.')
         current = self.config
@@ -9,11 +9,11 @@ Creates interactive HTML dashboard with:
 - Professional styling with color bars
 """
 
-import json
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Union
 from pathlib import Path
 from .structure_viewer import StructureViewer
+from .json_encoding import to_script_json
 
 
 class DashboardGenerator:
@@ -31,26 +31,35 @@ class DashboardGenerator:
         self.structure_viewer = StructureViewer(config_manager)
     
     def generate_dashboard(self, 
-                         data_points: List[Dict[str, Any]], 
+                         data_points: Union[Dict[str, Any], List[Dict[str, Any]]], 
                          data_summary: Dict[str, Any],
                          docking_data: Optional[List[Dict[str, Any]]] = None) -> str:
         """
         Generate complete HTML dashboard
         
         Args:
-            data_points: List of compound data dictionaries
+            data_points: Compound data, either as a dictionary of per-compound arrays
+                (see MolecularDataProcessor.prepare_visualization_columns) or as a
+                list of compound data dictionaries
             data_summary: Dataset summary information
             docking_data: Optional docking visualization data
             
         Returns:
             HTML content string
         """
-        self.logger.info(f"Generating dashboard for {len(data_points)} compounds")
+        # Prepare data for JavaScript; column-oriented data is expanded into
+        # per-compound objects by the browser
+        if isinstance(data_points, dict):
+            n_compounds = len(data_points.get('id', []))
+            data_json = f"expandColumns({to_script_json(data_points)})"
+        else:
+            n_compounds = len(data_points)
+            data_json = to_script_json(data_points)
         
-        # Prepare data for JavaScript
-        data_json = json.dumps(data_points, indent=2)
-        summary_json = json.dumps(data_summary, indent=2)
-        docking_json = json.dumps(docking_data or [], indent=2)
+        self.logger.info(f"Generating dashboard for {n_compounds} compounds")
+        
+        summary_json = to_script_json(data_summary)
+        docking_json = to_script_json(docking_data or [])
         
         # Check if docking is enabled
         docking_enabled = self.config.is_docking_enabled() and docking_data
@@ -63,7 +72,7 @@ class DashboardGenerator:
         
         # Get available properties for plot configuration
         available_props = data_summary.get('available_properties', [])
-        properties_json = json.dumps(available_props)
+        properties_json = to_script_json(available_props)
         
         # Get visualization configuration
         viz_config = self.config.get('visualization', {})
@@ -91,12 +100,31 @@ class DashboardGenerator:
     <div class="tooltip" id="tooltip"></div>
     
     <script>
+        // Expand column-oriented compound data into one object per compound,
+        // leaving out missing (null/NaN) values
+        function expandColumns(columns) {{
+            const keys = Object.keys(columns);
+            const n = keys.length ? columns[keys[0]].length : 0;
+            const rows = new Array(n);
+            for (let i = 0; i < n; i++) {{
+                const row = {{}};
+                for (const key of keys) {{
+                    const value = columns[key][i];
+                    if (value !== null && !(typeof value === 'number' && isNaN(value))) {{
+                        row[key] = value;
+                    }}
+                }}
+                rows[i] = row;
+            }}
+            return rows;
+        }}
+        
         // Global data and configuration
         const data = {data_json};
         const summary = {summary_json};
         const dockingData = {docking_json};
         const availableProperties = {properties_json};
-        const colorScheme = '{color_scheme}';
+        const colorScheme = {to_script_json(color_scheme)};
         const dockingEnabled = {str(docking_enabled).lower()};
         
         {self._generate_javascript()}
@@ -808,8 +836,8 @@ class DashboardGenerator:
             const validData = data.filter(d => 
                 d.hasOwnProperty(config.x_prop) && 
                 d.hasOwnProperty(config.y_prop) &&
-                !isNaN(d[config.x_prop]) && 
-                !isNaN(d[config.y_prop])
+                d[config.x_prop] != null && !isNaN(d[config.x_prop]) && 
+                d[config.y_prop] != null && !isNaN(d[config.y_prop])
             );
             
             if (validData.length === 0) {
@@ -853,7 +881,7 @@ class DashboardGenerator:
             // Color scale
             let colorScale = null;
             let colorExtent = null;
-            if (config.color_prop && validData.some(d => d.hasOwnProperty(config.color_prop) && !isNaN(d[config.color_prop]))) {
+            if (config.color_prop && validData.some(d => d[config.color_prop] != null && !isNaN(d[config.color_prop]))) {
                 colorExtent = d3.extent(validData, d => d[config.color_prop]);
                 colorScale = d3.scaleSequential(d3.interpolateViridis)
                     .domain(colorExtent);
@@ -1026,7 +1054,7 @@ class DashboardGenerator:
         
         function showTooltip(event, compound, config) {
             const tooltip = d3.select("#tooltip");
-            const colorInfo = config.color_prop && compound[config.color_prop] !== undefined ? 
+            const colorInfo = config.color_prop && compound[config.color_prop] != null ? 
                 `<br>${config.color_label}: ${compound[config.color_prop].toFixed(2)}` : '';
             
             tooltip.style("opacity", 1)
@@ -1071,7 +1099,7 @@ class DashboardGenerator:
             ];
             
             // Add docking results if available
-            if (dockingEnabled && compound.docking_score !== undefined && !isNaN(compound.docking_score)) {
+            if (dockingEnabled && compound.docking_score != null && !isNaN(compound.docking_score)) {
                 propertyBoxes.push({
                     label: 'Docking Score', 
                     value: `${compound.docking_score.toFixed(2)} kcal/mol`
@@ -1106,7 +1134,7 @@ class DashboardGenerator:
                         <div class="compound-item" onclick="selectDockingCompound(${compound.compound_id})">
                             <div class="compound-name">${compound.compound_name}</div>
                             <div class="binding-energy ${energyClass}">
-                                ${compound.docking_score.toFixed(2)} kcal/mol
+                                ${compound.docking_score != null ? compound.docking_score.toFixed(2) : 'N/A'} kcal/mol
                             </div>
                         </div>
                     `;
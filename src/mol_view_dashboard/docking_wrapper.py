@@ -10,23 +10,120 @@ Handles AutoDock Vina integration with MGLTools preparation
 """
 
 import os
+import re
+import mmap
 import subprocess
 import pandas as pd
 import numpy as np
 import logging
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, List, Optional, Any
 from pathlib import Path
 import tempfile
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+import sqlite3
+import zlib
 
 # RDKit imports for molecule preparation
 try:
-    from rdkit import Chem
+    from rdkit import Chem, rdBase
     from rdkit.Chem import AllChem, rdMolAlign
     from rdkit.Chem.rdMolAlign import AlignMol
 except ImportError as e:
     logging.warning(f"RDKit not available for docking: {e}")
 
+# First result row of the Vina results table: the header line is followed by
+# the units and separator lines, and the affinity is the row's second field
+VINA_RESULT_TABLE = re.compile(
+    rb'^[^\n]*(?:mode[^\n]*affinity|affinity[^\n]*mode)[^\n]*\n[^\n]*\n[^\n]*\n[ \t\r\f\v]*\S+[ \t\r\f\v]+(\S+)',
+    re.MULTILINE
+)
+
+# AutoDock-style summary line, used when no results table is present
+VINA_FREE_ENERGY_LINE = re.compile(rb'^[^\n]*Estimated Free Energy of Binding[^\n]*', re.MULTILINE)
+
+# Embedded ligand cache file (under performance.cache_dir)
+LIGAND_CACHE_FILE = 'ligand_embeddings.sqlite'
+
+# Part of the ligand cache key; change it whenever _embed_ligand changes
+LIGAND_EMBEDDING_METHOD = 'AddHs;EmbedMolecule(randomSeed=42);MMFFOptimizeMolecule()'
+
+
+def _vina_score(content: bytes) -> Optional[float]:
+    """
+    Extract the best docking score from the contents of a Vina log
+    
+    Args:
+        content: Log file contents (bytes or memory-mapped file)
+        
+    Returns:
+        Best docking score (kcal/mol), or None if no score was found
+    """
+    # Look for the results table
+    for match in VINA_RESULT_TABLE.finditer(content):
+        try:
+            return float(match.group(1))  # Binding affinity
+        except ValueError:
+            pass
+    
+    # If table format not found, look for other patterns
+    for match in VINA_FREE_ENERGY_LINE.finditer(content):
+        parts = match.group().decode(errors='replace').split()
+        for j, part in enumerate(parts):
+            if 'kcal/mol' in part and j > 0:
+                try:
+                    return float(parts[j-1])
+                except ValueError:
+                    pass
+    
+    return None
+
+
+def _embed_ligand(mol: Any, idx: int) -> Optional[str]:
+    """
+    Generate a 3D structure for a ligand with RDKit
+    
+    Safe to run in worker threads: RDKit releases the GIL while embedding
+    and optimizing, so ligands are processed concurrently.
+    
+    Args:
+        mol: RDKit molecule
+        idx: Ligand index (for log messages)
+        
+    Returns:
+        PDB block with hydrogens and optimized coordinates, or None on failure
+    """
+    logger = logging.getLogger(__name__)
+    try:
+        mol_h = Chem.AddHs(mol)
+        
+        # Try to embed molecule with multiple attempts
+        embed_result = AllChem.EmbedMolecule(mol_h, randomSeed=42)
+        if embed_result == -1:
+            # Try with different parameters
+            embed_result = AllChem.EmbedMolecule(mol_h, randomSeed=42, useRandomCoords=True)
+            if embed_result == -1:
+                logger.warning(f"Failed to embed 3D coordinates for ligand {idx}")
+                return None
+        
+        # Optimize geometry
+        try:
+            AllChem.MMFFOptimizeMolecule(mol_h)
+        except Exception as e:
+            logger.warning(f"MMFF optimization failed for ligand {idx}: {e}")
+            # Continue anyway, the embedded coordinates might still work
+        
+        pdb_block = Chem.MolToPDBBlock(mol_h)
+        if not pdb_block or pdb_block.strip() == "":
+            logger.warning(f"Empty PDB block generated for ligand {idx}")
+            return None
+        
+        return pdb_block
+    
+    except Exception as e:
+        logger.warning(f"Failed to prepare ligand {idx}: {e}")
+        return None
+
 
 class DockingError(Exception):
     """Custom exception for docking-related errors"""
@@ -47,6 +144,7 @@ class VinaDockingWrapper:
         self.logger = logging.getLogger(__name__)
         self.docking_results = []
         self.temp_dir = None
+        self.ligand_cache = None
         
         # MGLTools paths from configuration
         self.mgltools_path = self.config.get('docking.mgltools_path')
@@ -138,8 +236,8 @@ class VinaDockingWrapper:
         
         try:
             result = subprocess.run([vina_executable, '--help'], 
-                                 capture_output=True, 
-                                 text=True, 
+                                 stdout=subprocess.DEVNULL, 
+                                 stderr=subprocess.DEVNULL, 
                                  timeout=10)
             return result.returncode == 0
         except (subprocess.SubprocessError, FileNotFoundError):
@@ -201,7 +299,8 @@ class VinaDockingWrapper:
         self.logger.info(f"Running: {' '.join(cmd)}")
         
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+            result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                    text=True, timeout=300)
             
             if result.returncode == 0 and receptor_pdbqt.exists():
                 self.logger.info(f"Receptor prepared successfully: {receptor_pdbqt}")
@@ -222,12 +321,14 @@ class VinaDockingWrapper:
         except Exception as e:
             raise DockingError(f"Error preparing receptor: {e}")
     
-    def prepare_ligands(self, df: pd.DataFrame) -> List[str]:
+    def prepare_ligands(self, df: pd.DataFrame, mols: Optional[List[Any]] = None) -> List[str]:
         """
         Prepare ligand files from SMILES using MGLTools
         
         Args:
             df: DataFrame containing SMILES and molecule data
+            mols: RDKit molecules aligned with the rows of df (parsed from the
+                SMILES column if not given)
             
         Returns:
             List of prepared ligand PDBQT file paths
@@ -246,34 +347,21 @@ class VinaDockingWrapper:
         smiles_col = self.config.get('input.smiles_column', 'SMILES')
         prepare_ligand_script = f"{self.utilities_path}/prepare_ligand4.py"
         
-        for idx, row in df.iterrows():
+        if mols is None:
+            mols = [Chem.MolFromSmiles(smiles) if pd.notna(smiles) else None
+                    for smiles in df[smiles_col]]
+        
+        pdb_blocks = self._embed_ligands(mols)
+        
+        for (idx, row), pdb_block in zip(df.iterrows(), pdb_blocks):
             if idx % 10 == 0:
-                self.logger.info(f"  Preparing ligand {idx+1}/{len(df)}")
+                self.logger.info(f"  Converting ligand {idx+1}/{len(df)} to PDBQT")
             
             try:
-                mol = row['Mol']
-                if mol is None:
+                # Step 1: 3D structure generated with RDKit
+                if pdb_block is None:
                     continue
                 
-                # Step 1: Generate 3D structure using RDKit
-                mol_h = Chem.AddHs(mol)
-                
-                # Try to embed molecule with multiple attempts
-                embed_result = AllChem.EmbedMolecule(mol_h, randomSeed=42)
-                if embed_result == -1:
-                    # Try with different parameters
-                    embed_result = AllChem.EmbedMolecule(mol_h, randomSeed=42, useRandomCoords=True)
-                    if embed_result == -1:
-                        self.logger.warning(f"Failed to embed 3D coordinates for ligand {idx}")
-                        continue
-                
-                # Optimize geometry
-                try:
-                    AllChem.MMFFOptimizeMolecule(mol_h)
-                except Exception as e:
-                    self.logger.warning(f"MMFF optimization failed for ligand {idx}: {e}")
-                    # Continue anyway, the embedded coordinates might still work
-                
                 # Step 2: Write to PDB file using working directory approach
                 compound_name = row.get('title', f"ligand_{idx:04d}")
                 # Sanitize compound name for filename
@@ -285,11 +373,6 @@ class VinaDockingWrapper:
                 ligand_pdbqt = Path(self.temp_dir) / f"{safe_name}.pdbqt"
                 
                 # Write PDB file
-                pdb_block = Chem.MolToPDBBlock(mol_h)
-                if not pdb_block or pdb_block.strip() == "":
-                    self.logger.warning(f"Empty PDB block generated for ligand {idx}")
-                    continue
-                    
                 with open(ligand_pdb, 'w') as f:
                     f.write(pdb_block)
                 
@@ -310,7 +393,8 @@ class VinaDockingWrapper:
                         '-A', 'hydrogens'
                     ]
                     
-                    result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+                    result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                            text=True, timeout=60)
                     
                     if result.returncode == 0 and ligand_pdbqt.exists():
                         ligand_pdbqt_files.append(str(ligand_pdbqt))
@@ -329,6 +413,127 @@ class VinaDockingWrapper:
         self.logger.info(f"Successfully prepared {len(ligand_pdbqt_files)} ligand PDBQT files")
         return ligand_pdbqt_files
     
+    def _open_ligand_cache(self) -> Optional[sqlite3.Connection]:
+        """
+        Open the embedded ligand cache in performance.cache_dir
+        
+        Opt-in through performance.cache_ligand_embeddings. The cache maps
+        SMILES written in the ligand's own atom order to zlib-compressed PDB
+        blocks, so repeated runs skip 3D embedding and force field
+        optimization of ligands they have already prepared. Entries are keyed
+        by RDKit version and LIGAND_EMBEDDING_METHOD as well, and entries for
+        any other version or method are deleted when the cache is opened.
+        The connection is kept open until cleanup().
+        
+        Returns:
+            sqlite3 connection, or None if caching is disabled or unavailable
+        """
+        if self.ligand_cache is not None or not self.config.get('performance.cache_ligand_embeddings', False):
+            return self.ligand_cache
+        
+        try:
+            cache_dir = Path(self.config.get('performance.cache_dir', '.cache'))
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(str(cache_dir / LIGAND_CACHE_FILE), isolation_level=None)
+            connection.execute("CREATE TABLE IF NOT EXISTS ligand_embeddings "
+                               "(rdkit_version TEXT, method TEXT, smiles TEXT, pdb BLOB, "
+                               "PRIMARY KEY (rdkit_version, method, smiles))")
+            connection.execute("DELETE FROM ligand_embeddings WHERE rdkit_version != ? OR method != ?",
+                               (rdBase.rdkitVersion, LIGAND_EMBEDDING_METHOD))
+        except (OSError, sqlite3.Error) as e:
+            self.logger.warning(f"Ligand cache unavailable, embedding all ligands: {e}")
+            return None
+        
+        self.ligand_cache = connection
+        return connection
+    
+    def _embed_ligands(self, mols: List[Any]) -> List[Optional[str]]:
+        """
+        Generate 3D structures for ligands, reusing cached structures
+        
+        Ligands with the same canonical SMILES share the structure of the
+        first of them. Those missing from the cache are embedded concurrently
+        in worker threads when performance.n_jobs allows.
+        
+        Args:
+            mols: RDKit molecules (None entries are skipped)
+            
+        Returns:
+            List of PDB blocks aligned with mols, None where embedding failed
+        """
+        cache = self._open_ligand_cache()
+        pdb_blocks = [None] * len(mols)
+        
+        # Group ligands by canonical SMILES so that each distinct structure
+        # is looked up and embedded once
+        groups = {}
+        for idx, mol in enumerate(mols):
+            if mol is not None:
+                groups.setdefault(Chem.MolToSmiles(mol), []).append(idx)
+        
+        n_duplicates = sum(len(indices) - 1 for indices in groups.values())
+        if n_duplicates:
+            self.logger.info(f"  {n_duplicates} duplicate ligands share a structure with an earlier ligand")
+        
+        # Cache entries are keyed on the first ligand of each group in its own
+        # atom order, so a hit matches the atom numbering of a fresh embedding
+        cache_keys = {key: Chem.MolToSmiles(mols[indices[0]], canonical=False)
+                      for key, indices in groups.items()} if cache is not None else {}
+        
+        pending = []
+        for key, indices in groups.items():
+            cached = None
+            if cache is not None:
+                cached = cache.execute("SELECT pdb FROM ligand_embeddings "
+                                       "WHERE rdkit_version = ? AND method = ? AND smiles = ?",
+                                       (rdBase.rdkitVersion, LIGAND_EMBEDDING_METHOD, cache_keys[key])).fetchone()
+            if cached is None:
+                pending.append(key)
+                continue
+            pdb_block = zlib.decompress(cached[0]).decode()
+            for idx in indices:
+                pdb_blocks[idx] = pdb_block
+        
+        n_cached = len(groups) - len(pending)
+        if n_cached:
+            self.logger.info(f"  Reusing {n_cached} cached ligand structures")
+        
+        n_jobs = self.config.get('performance.n_jobs', -1) or -1
+        n_workers = min(n_jobs if n_jobs > 0 else (os.cpu_count() or 1), len(pending))
+        pending_indices = [groups[key][0] for key in pending]
+        pending_mols = [mols[idx] for idx in pending_indices]
+        
+        executor = None
+        if n_workers > 1:
+            self.logger.info(f"  Embedding {len(pending)} ligands with {n_workers} threads")
+            executor = ThreadPoolExecutor(max_workers=n_workers)
+            results = executor.map(_embed_ligand, pending_mols, pending_indices)
+        else:
+            results = map(_embed_ligand, pending_mols, pending_indices)
+        
+        embedded = []
+        try:
+            for pdb_block in results:
+                if len(embedded) % 10 == 0:
+                    self.logger.info(f"  Embedding ligand {len(embedded)+1}/{len(pending)}")
+                embedded.append(pdb_block)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        
+        for key, pdb_block in zip(pending, embedded):
+            for idx in groups[key]:
+                pdb_blocks[idx] = pdb_block
+            if pdb_block is not None and cache is not None:
+                try:
+                    cache.execute("INSERT OR REPLACE INTO ligand_embeddings VALUES (?, ?, ?, ?)",
+                                  (rdBase.rdkitVersion, LIGAND_EMBEDDING_METHOD, cache_keys[key],
+                                   zlib.compress(pdb_block.encode())))
+                except sqlite3.Error as e:
+                    self.logger.warning(f"Failed to cache ligand {groups[key][0]}: {e}")
+        
+        return pdb_blocks
+    
     def run_vina_docking(self, ligand_files: List[str], receptor_file: str) -> List[Dict[str, Any]]:
         """
         Run AutoDock Vina docking for prepared ligands
@@ -361,6 +566,7 @@ class VinaDockingWrapper:
         center = self.config.get('docking.binding_site.center')
         size = self.config.get('docking.binding_site.size')
         
+        vina_executable = self._get_vina_executable()
         docking_results = []
         
         for i, ligand_file in enumerate(ligand_files):
@@ -379,7 +585,6 @@ class VinaDockingWrapper:
                 log_file = output_dir / f"log_{ligand_idx:04d}_{compound_name}.txt"
                 
                 # Build Vina command with binding site parameters
-                vina_executable = self._get_vina_executable()
                 vina_cmd = [
                     vina_executable,
                     '--receptor', str(receptor_file),
@@ -397,9 +602,10 @@ class VinaDockingWrapper:
                     '--energy_range', str(energy_range)
                 ]
                 
-                # Run Vina
+                # Run Vina; its progress output is discarded (results go to --log)
                 result = subprocess.run(vina_cmd, 
-                                      capture_output=True, 
+                                      stdout=subprocess.DEVNULL, 
+                                      stderr=subprocess.PIPE, 
                                       text=True, 
                                       timeout=300)  # 5 minute timeout per ligand
                 
@@ -461,35 +667,16 @@ class VinaDockingWrapper:
             Best docking score (kcal/mol)
         """
         try:
-            with open(log_file, 'r') as f:
-                lines = f.readlines()
-            
-            # Look for the results table
-            for i, line in enumerate(lines):
-                if 'mode' in line and 'affinity' in line:
-                    # Skip the units line and get the first data line
-                    if i + 2 < len(lines):
-                        # Skip the "|  (kcal/mol) | rmsd l.b.| rmsd u.b." line
-                        # Skip the "-----+------------+----------+----------" line  
-                        # Get the actual first result line
-                        result_line = lines[i + 3].strip()
-                        parts = result_line.split()
-                        if len(parts) >= 2:
-                            try:
-                                return float(parts[1])  # Binding affinity
-                            except ValueError:
-                                pass
+            with open(log_file, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    # Empty files cannot be memory mapped
+                    score = None
+                else:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                        score = _vina_score(content)
             
-            # If table format not found, look for other patterns
-            for line in lines:
-                if 'Estimated Free Energy of Binding' in line:
-                    parts = line.split()
-                    for j, part in enumerate(parts):
-                        if 'kcal/mol' in part and j > 0:
-                            try:
-                                return float(parts[j-1])
-                            except ValueError:
-                                pass
+            if score is not None:
+                return score
             
             self.logger.warning(f"Could not parse docking score from {log_file}")
             return np.nan
@@ -562,6 +749,7 @@ class VinaDockingWrapper:
         
         viz_data = []
         output_dir = Path(self.config.get('docking.output_dir', 'docking_results'))
+        smiles_col = self.config.get('input.smiles_column', 'SMILES')
         
         for idx, row in df.iterrows():
             if row.get('docking_success', False):
@@ -580,7 +768,7 @@ class VinaDockingWrapper:
                         'compound_name': compound_name,
                         'docking_score': row.get('docking_score', np.nan),
                         'pose_file': str(result_file),
-                        'smiles': row.get(self.config.get('input.smiles_column', 'SMILES'), '')
+                        'smiles': row.get(smiles_col, '')
                     })
         
         self.logger.info(f"Prepared docking visualization data for {len(viz_data)} compounds")
@@ -588,6 +776,10 @@ class VinaDockingWrapper:
     
     def cleanup(self) -> None:
         """Clean up temporary files"""
+        if self.ligand_cache is not None:
+            self.ligand_cache.close()
+            self.ligand_cache = None
+        
         if self.temp_dir and Path(self.temp_dir).exists():
             try:
                 shutil.rmtree(self.temp_dir)
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+JSON Encoding
+Compact JSON serialization for data embedded in generated HTML, using
+msgspec when available and the standard library otherwise
+"""
+
+import json
+import math
+from typing import Any
+
+# Optional fast JSON encoder (falls back to the standard library)
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+def _replace_non_finite(obj: Any) -> Any:
+    """Replace NaN/Infinity floats with None, matching msgspec's null output"""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _replace_non_finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_replace_non_finite(value) for value in obj]
+    return obj
+
+
+def to_builtin(obj: Any) -> Any:
+    """Convert NumPy scalars/arrays (anything with tolist()) for JSON encoding"""
+    if hasattr(obj, 'tolist'):
+        return _replace_non_finite(obj.tolist())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+_json_encoder = msgspec.json.Encoder(enc_hook=to_builtin) if msgspec is not None else None
+
+
+def to_json(obj: Any) -> str:
+    """Serialize an object to compact JSON for embedding in HTML
+
+    Non-finite floats are written as null by both encoders.
+    """
+    if _json_encoder is not None:
+        return _json_encoder.encode(obj).decode()
+    return json.dumps(_replace_non_finite(obj), default=to_builtin, allow_nan=False)
+
+
+def to_script_json(obj: Any) -> str:
+    """Serialize an object to JSON that is safe inside a <script> element"""
+    return to_json(obj).replace('</', '<\\/')
@@ -8,6 +8,9 @@ Handles loading, processing, and analysis of molecular data including:
 - Data preparation for visualization
 """
 
+import os
+import csv
+import tempfile
 import pandas as pd
 import numpy as np
 import logging
@@ -15,21 +18,116 @@ from typing import Dict, List, Tuple, Optional, Any
 from pathlib import Path
 import base64
 from io import BytesIO
+from functools import partial
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 
-from sklearn.manifold import TSNE
-from sklearn.decomposition import PCA
-from sklearn.preprocessing import StandardScaler
-
-# RDKit imports
+# RDKit imports (scikit-learn, openTSNE, SA_Score, PIL and the drawing code are
+# imported where they are used to keep CLI startup fast)
 try:
     from rdkit import Chem
-    from rdkit.Chem import Descriptors, Crippen, Lipinski, QED, Draw
+    from rdkit.Chem import Descriptors, Crippen, Lipinski, QED
     from rdkit.Chem import rdMolDescriptors, rdFingerprintGenerator
-    from rdkit.Contrib.SA_Score import sascorer
     from rdkit import DataStructs
 except ImportError as e:
     raise ImportError(f"RDKit is required. Install with: conda install -c conda-forge rdkit. Error: {e}")
 
+# Sanitization used by analysis.fast_parse: skips chirality cleanup and
+# conjugation perception, neither of which affects the descriptors or
+# fingerprints calculated here
+FAST_PARSE_SANITIZE_OPS = (
+    Chem.SanitizeFlags.SANITIZE_ALL
+    ^ Chem.SanitizeFlags.SANITIZE_CLEANUPCHIRALITY
+    ^ Chem.SanitizeFlags.SANITIZE_SETCONJUGATION
+)
+
+# Palette size for visualization.quantize_structure_images. Structures are
+# line art on white, so a small palette is visually lossless; quantizing
+# shrinks each PNG about 4x but makes encoding roughly 2.5x slower, so it is
+# off by default. PNG optimize=True saves only ~2% more and is not used.
+STRUCTURE_IMAGE_COLORS = 16
+
+# Start method for the image rendering pool: workers start from a clean
+# interpreter instead of forking a process that already runs pyarrow, RDKit
+# and openTSNE threads
+IMAGE_POOL_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+# Minimum library size for which multithreaded SMILES parsing pays off
+PARALLEL_PARSE_MIN_COMPOUNDS = 1000
+
+# Minimum library size for which the image rendering pool pays off; each
+# worker re-imports RDKit and pandas, so smaller sets render faster serially
+PARALLEL_RENDER_MIN_COMPOUNDS = 1000
+
+# Standard molecular descriptors calculated for every compound
+DESCRIPTOR_COLUMNS = [
+    'MW', 'LogP', 'TPSA', 'HBA', 'HBD', 'QED', 'SAscore', 'RotBonds', 'NumRings'
+]
+
+
+def _partial_sanitize(mol):
+    """Sanitize an unsanitized molecule with FAST_PARSE_SANITIZE_OPS (None on failure)"""
+    if mol is None:
+        return None
+    
+    try:
+        Chem.SanitizeMol(mol, sanitizeOps=FAST_PARSE_SANITIZE_OPS)
+        return mol
+    except Chem.MolSanitizeException:
+        return None
+
+
+def _mol_to_png_data_uri(mol, size: Tuple[int, int], quantize: bool = False) -> str:
+    """Draw a molecule to a PNG (palette-quantized if requested) and wrap it as a data URI"""
+    from rdkit.Chem.Draw import rdMolDraw2D
+    
+    drawer = rdMolDraw2D.MolDraw2DCairo(*size)
+    rdMolDraw2D.PrepareAndDrawMolecule(drawer, mol)
+    drawer.FinishDrawing()
+    png_bytes = drawer.GetDrawingText()
+    
+    if quantize:
+        # Optional PIL for palette quantization
+        try:
+            from PIL import Image
+        except ImportError:
+            Image = None
+        
+        if Image is not None:
+            img = Image.open(BytesIO(png_bytes)).convert('RGB').quantize(colors=STRUCTURE_IMAGE_COLORS)
+            buffered = BytesIO()
+            img.save(buffered, format="PNG")
+            png_bytes = buffered.getvalue()
+    
+    img_str = base64.b64encode(png_bytes).decode()
+    return f"data:image/png;base64,{img_str}"
+
+
+def _render_png(smiles: str, size: Tuple[int, int] = (200, 140), quantize: bool = False) -> str:
+    """
+    Render a SMILES string to a base64 encoded PNG image
+    
+    Module-level so it can run in worker processes; takes SMILES rather than
+    an RDKit molecule to avoid pickling Mol objects.
+    
+    Args:
+        smiles: SMILES string
+        size: Image size tuple (width, height)
+        quantize: Whether to reduce the image to a STRUCTURE_IMAGE_COLORS palette
+        
+    Returns:
+        Base64 encoded image string (empty on failure)
+    """
+    mol = Chem.MolFromSmiles(smiles)
+    if mol is None:
+        return ""
+    
+    try:
+        return _mol_to_png_data_uri(mol, size, quantize)
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Error generating structure image: {e}")
+        return ""
+
 
 class MolecularDataProcessor:
     """Processes molecular data for analysis and visualization"""
@@ -44,6 +142,7 @@ class MolecularDataProcessor:
         self.config = config_manager
         self.logger = logging.getLogger(__name__)
         self.df = None
+        self.mols = []  # RDKit molecules aligned with self.df rows
         self.fingerprint_matrix = None
         self.pca_coords = None
         self.tsne_coords = None
@@ -61,21 +160,23 @@ class MolecularDataProcessor:
         """
         self.logger.info(f"Loading data from: {csv_file}")
         
+        smiles_col = self.config.get('input.smiles_column', 'SMILES')
+        name_col = self.config.get('input.name_column', 'Name')
+        
         # Load CSV file
         try:
-            self.df = pd.read_csv(csv_file)
-            self.logger.info(f"Original data shape: {self.df.shape}")
-            self.logger.info(f"Columns: {list(self.df.columns)}")
+            self.df = self._read_csv(csv_file)
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info(f"Original data shape: {self.df.shape}")
+                self.logger.info(f"Columns: {list(self.df.columns)}")
         except Exception as e:
             raise ValueError(f"Error loading CSV file: {e}")
         
         # Validate required columns
-        smiles_col = self.config.get('input.smiles_column', 'SMILES')
         if smiles_col not in self.df.columns:
             raise ValueError(f"Required SMILES column '{smiles_col}' not found in CSV")
         
         # Handle optional Name column
-        name_col = self.config.get('input.name_column', 'Name')
         if name_col not in self.df.columns:
             self.df[name_col] = [f"Compound_{i+1}" for i in range(len(self.df))]
             self.logger.info(f"Generated {name_col} column")
@@ -83,25 +184,122 @@ class MolecularDataProcessor:
         # Map Name to title for internal consistency
         self.df['title'] = self.df[name_col]
         
-        # Create molecule objects from SMILES
+        # Create molecule objects from SMILES (kept outside the DataFrame so
+        # that it only holds primitive columns)
         self.logger.info("Creating molecule objects from SMILES...")
-        self.df['Mol'] = self.df[smiles_col].apply(
-            lambda x: Chem.MolFromSmiles(x) if pd.notna(x) else None
-        )
+        mols = self._parse_smiles(self.df[smiles_col].tolist())
+        valid_mask = np.array([mol is not None for mol in mols], dtype=bool)
         
         # Report failed SMILES
-        failed_smiles = self.df[self.df['Mol'].isna()]
+        failed_smiles = self.df[~valid_mask]
         if len(failed_smiles) > 0:
             self.logger.warning(f"Failed to parse {len(failed_smiles)} SMILES")
             for idx, row in failed_smiles.head().iterrows():
                 self.logger.warning(f"  {idx}: {row[smiles_col]}")
         
         # Filter valid molecules
-        self.df = self.df[self.df['Mol'].notna()].reset_index(drop=True)
+        self.df = self.df[valid_mask].reset_index(drop=True)
+        self.mols = [mol for mol in mols if mol is not None]
         self.logger.info(f"Valid molecules: {len(self.df)}")
         
         return self.df
     
+    def _n_workers(self) -> int:
+        """Number of parallel workers from performance.n_jobs (-1 uses all cores)"""
+        n_jobs = self.config.get('performance.n_jobs', -1) or -1
+        return n_jobs if n_jobs > 0 else (os.cpu_count() or 1)
+    
+    def _parse_smiles(self, smiles_list: List[Any]) -> List[Optional[Chem.Mol]]:
+        """
+        Parse SMILES strings into RDKit molecules
+        
+        Large libraries are parsed with RDKit's MultithreadedSmilesMolSupplier;
+        each record carries its position as the name column so results can be
+        realigned with the input order. Entries the .smi format cannot carry
+        unchanged (empty strings, or text with whitespace, which
+        Chem.MolFromSmiles reads as a SMILES followed by a name) are parsed
+        serially, so both paths return the same molecules. With
+        'analysis.fast_parse' enabled (and docking disabled, since 3D
+        embedding needs fully sanitized molecules) a reduced set of
+        sanitization steps is applied.
+        
+        Args:
+            smiles_list: SMILES strings (missing values allowed)
+            
+        Returns:
+            List of molecules aligned with the input, None where parsing failed
+        """
+        fast_parse = (self.config.get('analysis.fast_parse', False)
+                      and not self.config.is_docking_enabled())
+        
+        def parse(smiles):
+            if not pd.notna(smiles):
+                return None
+            if fast_parse:
+                return _partial_sanitize(Chem.MolFromSmiles(smiles, sanitize=False))
+            return Chem.MolFromSmiles(smiles)
+        
+        n_workers = self._n_workers()
+        if n_workers > 1 and len(smiles_list) >= PARALLEL_PARSE_MIN_COMPOUNDS:
+            fd, smi_path = tempfile.mkstemp(suffix='.smi')
+            try:
+                serial_indices = []
+                with os.fdopen(fd, 'w') as f:
+                    for i, smiles in enumerate(smiles_list):
+                        if isinstance(smiles, str) and smiles.split() == [smiles]:
+                            f.write(f"{smiles}\t{i}\n")
+                        elif pd.notna(smiles):
+                            serial_indices.append(i)
+                
+                mols = [None] * len(smiles_list)
+                supplier = Chem.MultithreadedSmilesMolSupplier(
+                    smi_path, delimiter='\t', smilesColumn=0, nameColumn=1,
+                    titleLine=False, sanitize=not fast_parse, numWriterThreads=n_workers
+                )
+                for mol in supplier:
+                    if fast_parse:
+                        mol = _partial_sanitize(mol)
+                    if mol is not None:
+                        mols[int(mol.GetProp('_Name'))] = mol
+                        mol.ClearProp('_Name')
+                del supplier
+                
+                for i in serial_indices:
+                    mols[i] = parse(smiles_list[i])
+                return mols
+            except Exception as e:
+                self.logger.warning(f"Multithreaded SMILES parsing failed, falling back to serial: {e}")
+            finally:
+                os.unlink(smi_path)
+        
+        return [parse(smiles) for smiles in smiles_list]
+    
+    def _read_csv(self, csv_file: str) -> pd.DataFrame:
+        """
+        Read the input CSV with every column, so all of them reach the export
+        
+        Uses the multithreaded pyarrow parser when it is installed. Files it
+        reads differently from the default C parser go through the C parser:
+        blank or repeated header names (renamed to 'Unnamed: N' / 'Name.1')
+        and ragged rows, which pyarrow rejects.
+        
+        Args:
+            csv_file: Path to CSV file
+            
+        Returns:
+            Loaded DataFrame
+        """
+        with open(csv_file, newline='') as f:
+            header = next(csv.reader(f), [])
+        if '' in header or len(set(header)) != len(header):
+            return pd.read_csv(csv_file)
+        
+        try:
+            return pd.read_csv(csv_file, engine='pyarrow')
+        except (ImportError, ValueError):
+            # pandas' ParserError and pyarrow's ArrowInvalid are ValueErrors
+            return pd.read_csv(csv_file)
+    
     def calculate_molecular_descriptors(self) -> pd.DataFrame:
         """
         Calculate comprehensive molecular descriptors
@@ -118,12 +316,11 @@ class MolecularDataProcessor:
         
         self.logger.info(f"Calculating molecular descriptors for {len(self.df)} compounds...")
         
+        from rdkit.Contrib.SA_Score import sascorer
+        
         descriptors = []
         
-        for i, mol in enumerate(self.df['Mol']):
-            if i % 100 == 0:
-                self.logger.info(f"  Processing molecule {i+1}/{len(self.df)}")
-            
+        for i, mol in enumerate(self.mols):
             try:
                 desc = {
                     # Basic properties
@@ -148,20 +345,24 @@ class MolecularDataProcessor:
             
             descriptors.append(desc)
         
-        # Add descriptors to dataframe
-        desc_df = pd.DataFrame(descriptors)
-        for col in desc_df.columns:
+        # Add descriptors to dataframe: columns already in the input are
+        # overwritten in place, new ones are appended in one block
+        desc_df = pd.DataFrame(descriptors, index=self.df.index)
+        new_cols = [col for col in desc_df.columns if col not in self.df.columns]
+        for col in desc_df.columns.difference(new_cols, sort=False):
             self.df[col] = desc_df[col]
+        self.df = pd.concat([self.df, desc_df[new_cols]], axis=1)
         
         # For testing purposes, keep all compounds even if some descriptors failed
         self.logger.info(f"Final dataset: {len(self.df)} compounds (with some potential missing descriptors)")
         
-        # Log descriptor summary
-        self.logger.info("Descriptor summary:")
-        summary_cols = ['MW', 'LogP', 'TPSA', 'QED', 'SAscore', 'HBA', 'HBD', 'RotBonds', 'NumRings']
-        available_cols = [col for col in summary_cols if col in self.df.columns]
-        if available_cols:
-            self.logger.info(f"\n{self.df[available_cols].describe()}")
+        # Log descriptor summary (describe() is only computed when it will be shown)
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info("Descriptor summary:")
+            summary_cols = ['MW', 'LogP', 'TPSA', 'QED', 'SAscore', 'HBA', 'HBD', 'RotBonds', 'NumRings']
+            available_cols = [col for col in summary_cols if col in self.df.columns]
+            if available_cols:
+                self.logger.info(f"\n{self.df[available_cols].describe()}")
         
         return self.df
     
@@ -192,18 +393,16 @@ class MolecularDataProcessor:
             self.logger.warning(f"Unknown fingerprint type '{fp_type}', using Morgan")
             generator = rdFingerprintGenerator.GetMorganGenerator(radius=radius, fpSize=n_bits)
         
-        fingerprints = []
-        
-        for i, mol in enumerate(self.df['Mol']):
-            if i % 100 == 0:
-                self.logger.info(f"  Processing molecule {i+1}/{len(self.df)}")
-            
-            fp = generator.GetFingerprint(mol)
-            fp_array = np.zeros((n_bits,))
-            DataStructs.ConvertToNumpyArray(fp, fp_array)
-            fingerprints.append(fp_array)
+        # Compute all fingerprints in one C++ call (older RDKit: one per molecule)
+        if hasattr(generator, 'GetFingerprints'):
+            fingerprints = generator.GetFingerprints(self.mols, numThreads=self._n_workers())
+        else:
+            fingerprints = [generator.GetFingerprint(mol) for mol in self.mols]
         
-        self.fingerprint_matrix = np.array(fingerprints)
+        # Fill a preallocated bit matrix row by row
+        self.fingerprint_matrix = np.empty((len(fingerprints), n_bits), dtype=np.uint8)
+        for i, fp in enumerate(fingerprints):
+            DataStructs.ConvertToNumpyArray(fp, self.fingerprint_matrix[i])
         self.logger.info(f"Fingerprint matrix shape: {self.fingerprint_matrix.shape}")
         
         return self.fingerprint_matrix
@@ -228,6 +427,9 @@ class MolecularDataProcessor:
         
         self.logger.info("Performing chemical space analysis...")
         
+        from sklearn.decomposition import PCA
+        from sklearn.preprocessing import StandardScaler
+        
         # Standardize features
         scaler = StandardScaler()
         fp_scaled = scaler.fit_transform(self.fingerprint_matrix)
@@ -257,12 +459,31 @@ class MolecularDataProcessor:
             perplexity = min(tsne_config.get('perplexity', 30), len(self.df)//4)
             random_state = tsne_config.get('random_state', 42)
             
-            tsne = TSNE(
-                n_components=n_components, 
-                random_state=random_state, 
-                perplexity=perplexity
-            )
-            self.tsne_coords = tsne.fit_transform(fp_scaled)
+            # Prefer openTSNE's multithreaded FFT implementation over scikit-learn
+            try:
+                from openTSNE import TSNE as OpenTSNE
+            except ImportError:
+                OpenTSNE = None
+            
+            if OpenTSNE is not None:
+                # FFT gradients only support up to 2 dimensions
+                tsne = OpenTSNE(
+                    n_components=n_components,
+                    perplexity=perplexity,
+                    n_jobs=self.config.get('performance.n_jobs', -1),
+                    random_state=random_state,
+                    negative_gradient_method='fft' if n_components <= 2 else 'bh'
+                )
+                self.tsne_coords = np.asarray(tsne.fit(fp_scaled))
+            else:
+                from sklearn.manifold import TSNE
+                
+                tsne = TSNE(
+                    n_components=n_components, 
+                    random_state=random_state, 
+                    perplexity=perplexity
+                )
+                self.tsne_coords = tsne.fit_transform(fp_scaled)
             
             # Add t-SNE coordinates to dataframe
             for i in range(n_components):
@@ -281,13 +502,14 @@ class MolecularDataProcessor:
             self.pca_model.explained_variance_ratio_ if self.pca_model else np.array([])
         )
     
-    def mol_to_base64_png(self, mol, size=(200, 140)) -> str:
+    def mol_to_base64_png(self, mol, size=(200, 140), quantize: bool = False) -> str:
         """
         Convert molecule to base64 encoded PNG image
         
         Args:
             mol: RDKit molecule object
             size: Image size tuple (width, height)
+            quantize: Whether to reduce the image to a STRUCTURE_IMAGE_COLORS palette
             
         Returns:
             Base64 encoded image string
@@ -296,80 +518,135 @@ class MolecularDataProcessor:
             return ""
         
         try:
-            img = Draw.MolToImage(mol, size=size)
-            buffered = BytesIO()
-            img.save(buffered, format="PNG")
-            img_str = base64.b64encode(buffered.getvalue()).decode()
-            return f"data:image/png;base64,{img_str}"
+            return _mol_to_png_data_uri(mol, size, quantize)
         except Exception as e:
             self.logger.warning(f"Error generating structure image: {e}")
             return ""
     
-    def prepare_visualization_data(self) -> List[Dict[str, Any]]:
+    def _render_structure_images(self, smiles_list: List[str]) -> List[str]:
         """
-        Prepare data for visualization dashboard
+        Render structure images for all compounds, in parallel when worthwhile
+        
+        Worker processes receive SMILES; the serial path draws the already
+        parsed molecules in self.mols.
         
+        Args:
+            smiles_list: SMILES strings in compound order
+            
         Returns:
-            List of dictionaries containing compound data for visualization
+            List of base64 encoded image strings
+        """
+        quantize = self.config.get('visualization.quantize_structure_images', False)
+        chunksize = 32
+        n_workers = min(self._n_workers(), -(-len(smiles_list) // chunksize))
+        
+        if n_workers > 1 and len(smiles_list) >= PARALLEL_RENDER_MIN_COMPOUNDS:
+            self.logger.info(f"  Rendering {len(smiles_list)} structure images with {n_workers} processes")
+            try:
+                mp_context = multiprocessing.get_context(IMAGE_POOL_START_METHOD)
+                with ProcessPoolExecutor(max_workers=n_workers, mp_context=mp_context) as executor:
+                    return list(executor.map(partial(_render_png, quantize=quantize), smiles_list,
+                                             chunksize=chunksize))
+            except Exception as e:
+                self.logger.warning(f"Parallel image generation failed, falling back to serial: {e}")
+        
+        if len(self.mols) == len(smiles_list):
+            return [self.mol_to_base64_png(mol, quantize=quantize) for mol in self.mols]
+        return [_render_png(smiles, quantize=quantize) for smiles in smiles_list]
+    
+    def _float_column(self, col: str) -> np.ndarray:
+        """
+        Extract a DataFrame column as floats, keeping non-numeric values as strings
+        
+        Args:
+            col: Column name
+            
+        Returns:
+            float64 array with NaN for missing values, or an object array
+            (None for missing values) if the column is not fully numeric
+        """
+        series = self.df[col]
+        try:
+            return series.to_numpy(dtype=np.float64, na_value=np.nan)
+        except (ValueError, TypeError):
+            pass
+        
+        values = np.empty(len(series), dtype=object)
+        for i, (value, valid) in enumerate(zip(series.to_numpy(), series.notna().to_numpy())):
+            if not valid:
+                values[i] = None
+                continue
+            try:
+                values[i] = float(value)
+            except (ValueError, TypeError):
+                values[i] = str(value)
+        return values
+    
+    def prepare_visualization_columns(self) -> Dict[str, np.ndarray]:
+        """
+        Prepare column-oriented data for visualization dashboard
+        
+        Returns:
+            Dictionary mapping each field to an array with one entry per compound;
+            missing values are NaN (or None for non-numeric columns)
         """
         if self.df is None:
             raise ValueError("No molecular data processed")
         
         self.logger.info("Preparing visualization data...")
         
-        data_points = []
         smiles_col = self.config.get('input.smiles_column', 'SMILES')
+        property_cols = self.config.get('input.property_columns', []) or []
         
-        for idx, row in self.df.iterrows():
-            if idx % 50 == 0:
-                self.logger.info(f"  Processing compound {idx+1}/{len(self.df)}")
-            
-            # Generate structure image
-            img_base64 = self.mol_to_base64_png(row['Mol'])
-            
-            # Base data point
-            data_point = {
-                'id': int(idx),
-                'title': str(row.get('title', f"Compound_{idx+1}")),
-                'smiles': str(row[smiles_col]),
-            }
-            
-            # Add molecular descriptors
-            descriptor_cols = [
-                'MW', 'LogP', 'TPSA', 'HBA', 'HBD', 'QED', 'SAscore', 
-                'RotBonds', 'NumRings'
-            ]
-            
-            for col in descriptor_cols:
-                if col in row and pd.notna(row[col]):
-                    data_point[col.lower()] = float(row[col])
-            
-            # Add chemical space coordinates
-            if 'PCA_1' in row and pd.notna(row['PCA_1']):
-                data_point['pca_x'] = float(row['PCA_1'])
-                data_point['pca_y'] = float(row['PCA_2'])
-            
-            if 'tSNE_1' in row and pd.notna(row['tSNE_1']):
-                data_point['tsne_x'] = float(row['tSNE_1'])
-                data_point['tsne_y'] = float(row['tSNE_2'])
-            
-            # Add custom property columns
-            property_cols = self.config.get('input.property_columns', []) or []
-            for prop_col in property_cols:
-                if prop_col in row and pd.notna(row[prop_col]):
-                    # Normalize property name for JavaScript
-                    prop_key = prop_col.lower().replace(' ', '_').replace('-', '_')
-                    try:
-                        data_point[prop_key] = float(row[prop_col])
-                    except (ValueError, TypeError):
-                        data_point[prop_key] = str(row[prop_col])
-            
-            # Add structure image
-            data_point['image'] = img_base64
-            
-            data_points.append(data_point)
+        ids = self.df.index.to_numpy()
+        smiles = self.df[smiles_col].to_numpy().astype(str)
+        if 'title' in self.df.columns:
+            titles = self.df['title'].to_numpy().astype(str)
+        else:
+            titles = np.array([f"Compound_{idx+1}" for idx in ids])
+        
+        columns = {'id': ids, 'title': titles, 'smiles': smiles}
+        
+        # Add molecular descriptors
+        for col in DESCRIPTOR_COLUMNS:
+            if col in self.df.columns:
+                columns[col.lower()] = self._float_column(col)
+        
+        # Add chemical space coordinates
+        for key, col in (('pca_x', 'PCA_1'), ('pca_y', 'PCA_2'), ('tsne_x', 'tSNE_1'), ('tsne_y', 'tSNE_2')):
+            if col in self.df.columns:
+                columns[key] = self._float_column(col)
+        
+        # Add custom property columns (names normalized for JavaScript)
+        for prop_col in property_cols:
+            if prop_col in self.df.columns:
+                prop_key = prop_col.lower().replace(' ', '_').replace('-', '_')
+                columns[prop_key] = self._float_column(prop_col)
+        
+        # Generate structure images
+        columns['image'] = np.array(self._render_structure_images(smiles.tolist()), dtype=object)
+        
+        self.logger.info(f"Visualization data prepared for {len(ids)} compounds")
+        return columns
+    
+    def prepare_visualization_data(self) -> List[Dict[str, Any]]:
+        """
+        Prepare data for visualization dashboard
+        
+        Returns:
+            List of dictionaries containing compound data for visualization
+        """
+        columns = self.prepare_visualization_columns()
+        keys = list(columns)
+        
+        # Missing values are left out of the per-compound dictionaries
+        data_points = []
+        for values in zip(*(columns[key].tolist() for key in keys)):
+            data_points.append({
+                key: value for key, value in zip(keys, values)
+                if value is not None and value == value
+            })
         
-        self.logger.info(f"Visualization data prepared for {len(data_points)} compounds")
         return data_points
     
     def get_available_properties(self) -> List[str]:
@@ -383,10 +660,7 @@ class MolecularDataProcessor:
             return []
         
         # Standard molecular descriptors
-        standard_props = [
-            'MW', 'LogP', 'TPSA', 'HBA', 'HBD', 'QED', 'SAscore',
-            'RotBonds', 'NumRings'
-        ]
+        standard_props = DESCRIPTOR_COLUMNS
         
         # Custom properties from input
         custom_props = self.config.get('input.property_columns', []) or []
@@ -16,11 +16,107 @@ Usage:
 
 import os
 import sys
+import mmap
 import argparse
 import logging
+from contextlib import nullcontext
+import numpy as np
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
-from collections import defaultdict
+from typing import Iterable, Iterator, Set, Tuple
+
+# Coordinate record names (columns 1-6)
+ATOM_RECORDS = (b'ATOM  ', b'HETATM')
+
+# Residue categories removed by the HETATM filters, in reporting order
+REMOVAL_CATEGORIES = ('waters', 'ions', 'ligands')
+
+# Lines converted from NumPy offsets to Python objects at a time while writing
+WRITE_CHUNK_LINES = 1 << 16
+
+# Atom name, residue name, chain, residue number and insertion code columns
+# (0-based; the alt_loc column 16 is skipped so conformers share a key)
+ATOM_KEY_COLUMNS = [*range(12, 16), *range(17, 27)]
+
+
+def _fixed_columns(raw: np.ndarray, starts: np.ndarray, stops: np.ndarray,
+                   columns: Iterable[int]) -> np.ndarray:
+    """
+    Gather fixed-width columns from many lines of a byte buffer at once
+    
+    Args:
+        raw: File contents as a uint8 array
+        starts: Offset of each line
+        stops: End offset of each line (excluding the newline)
+        columns: 0-based column positions to gather
+        
+    Returns:
+        (n_lines, n_columns) uint8 array, blank-padded where a line is too short
+    """
+    columns = list(columns)
+    out = np.empty((len(starts), len(columns)), dtype=np.uint8)
+    last = len(raw) - 1
+    for j, column in enumerate(columns):
+        pos = starts + column
+        out[:, j] = np.where(pos < stops, raw[np.minimum(pos, last)], 32)
+    return out
+
+
+def _pack_columns(columns: np.ndarray) -> np.ndarray:
+    """
+    Pack each row of a byte matrix into 64-bit integers
+    
+    Args:
+        columns: (n_rows, width) uint8 array
+        
+    Returns:
+        (n_rows, ceil(width / 8)) big-endian uint64 array; equal rows pack to equal integers
+    """
+    n_rows, width = columns.shape
+    padded = np.zeros((n_rows, -(-width // 8) * 8), dtype=np.uint8)
+    padded[:, :width] = columns
+    return padded.view('>u8')
+
+
+def _residue_field_variants(names: Iterable[str]) -> Set[bytes]:
+    """
+    Expand residue names into every blank-padded form of the 3-column residue
+    name field, so fields can be matched without stripping them first
+    
+    Args:
+        names: Residue names (1-3 characters)
+        
+    Returns:
+        Set of 3-byte fields, e.g. b' ZN' and b'ZN ' for 'ZN'
+    """
+    fields = set()
+    for name in names:
+        for offset in range(3 - len(name) + 1):
+            fields.add((' ' * offset + name).ljust(3).encode())
+    return fields
+
+
+def _parse_floats(fields: np.ndarray, dtype=np.float64) -> np.ndarray:
+    """
+    Parse an array of fixed-width byte fields as floats
+    
+    Args:
+        fields: Array of bytes fields (dtype 'S<n>')
+        dtype: Floating point dtype of the result
+        
+    Returns:
+        Array of the given dtype, with 0.0 for blank or unparsable fields
+    """
+    values = np.zeros(len(fields), dtype=dtype)
+    filled = np.char.strip(fields) != b''
+    try:
+        values[filled] = fields[filled].astype(dtype)
+    except ValueError:
+        for i in np.flatnonzero(filled):
+            try:
+                values[i] = float(fields[i])
+            except ValueError:
+                pass
+    return values
 
 
 class PDBCleaner:
@@ -36,6 +132,9 @@ class PDBCleaner:
             'TYR', 'VAL'
         }
         
+        # Water residue names
+        self.water_residues = {'HOH', 'WAT', 'H2O', 'TIP', 'SOL'}
+        
         # Common ions and cofactors to potentially remove
         self.common_ions = {
             'CA', 'MG', 'ZN', 'FE', 'MN', 'CU', 'NA', 'K', 'CL', 'SO4',
@@ -57,207 +156,211 @@ class PDBCleaner:
         """
         self.logger.info(f"Cleaning PDB file: {input_file}")
         
-        # Read and parse PDB file
-        with open(input_file, 'r') as f:
-            lines = f.readlines()
-        
-        # Process alternative conformations
-        cleaned_lines = self._resolve_alternative_conformations(lines)
-        
-        # Filter out unwanted records
-        final_lines = self._filter_records(cleaned_lines, remove_waters, 
-                                         remove_ions, remove_ligands)
-        
-        # Write cleaned PDB
-        with open(output_file, 'w') as f:
-            f.writelines(final_lines)
+        # Map the PDB file into memory (empty files cannot be memory mapped);
+        # the mapping is closed once the cleaned records have been written
+        with open(input_file, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            with (mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else nullcontext(b'')) as buffer:
+                # Resolve alternative conformations and filter out unwanted records
+                # in a single pass over the file
+                final_lines, original_atoms, cleaned_atoms = self._resolve_alternative_conformations(
+                    buffer, remove_waters, remove_ions, remove_ligands)
+                
+                # Stream the cleaned PDB through a large write buffer
+                with open(output_file, 'wb', buffering=1 << 20) as out:
+                    out.writelines(final_lines)
         
         self.logger.info(f"Cleaned PDB saved to: {output_file}")
         
         # Report cleaning statistics
-        self._report_cleaning_stats(lines, final_lines)
+        self._report_cleaning_stats(original_atoms, cleaned_atoms)
     
-    def _resolve_alternative_conformations(self, lines: List[str]) -> List[str]:
+    def _resolve_alternative_conformations(self, buffer, remove_waters: bool = False,
+                                           remove_ions: bool = False,
+                                           remove_ligands: bool = False) -> Tuple[Iterator[bytes], int, int]:
         """
         Resolve alternative conformations by selecting the highest occupancy
+        and drop unwanted HETATM records
+        
+        The file is processed column-wise with NumPy: line offsets, record names,
+        atom keys, occupancies and residue names are extracted for all lines at
+        once, the winning conformer of each atom is chosen by sorting and the
+        removal filters are applied to the winners in the same pass.
         
         Args:
-            lines: List of PDB file lines
+            buffer: PDB file contents (memory-mapped file or bytes)
+            remove_waters: Remove water molecules
+            remove_ions: Remove ions
+            remove_ligands: Remove non-protein ligands
             
         Returns:
-            List of cleaned lines with alternative conformations resolved
+            Tuple of (iterator over the cleaned records, number of ATOM/HETATM
+            records in the input, number kept)
         """
-        # Group all related lines (ATOM, HETATM, ANISOU) by residue and atom
-        atom_groups = defaultdict(list)
-        other_lines = []
+        raw = np.frombuffer(buffer, dtype=np.uint8)
+        if raw.size == 0:
+            return iter(()), 0, 0
         
-        i = 0
-        while i < len(lines):
-            line = lines[i]
-            
-            if line.startswith(('ATOM', 'HETATM')):
-                # Parse atom record
-                chain_id = line[21:22].strip()
-                res_num = line[22:26].strip()
-                res_name = line[17:20].strip()
-                atom_name = line[12:16].strip()
-                alt_loc = line[16:17].strip()
-                
-                # Create unique key for this atom position
-                key = (chain_id, res_num, res_name, atom_name)
-                
-                # Collect this atom line and any following ANISOU line
-                atom_block = [line]
-                
-                # Check if next line is ANISOU for this atom
-                if (i + 1 < len(lines) and 
-                    lines[i + 1].startswith('ANISOU') and
-                    lines[i + 1][6:11] == line[6:11]):  # Same atom serial number
-                    atom_block.append(lines[i + 1])
-                    i += 1  # Skip the ANISOU line in main loop
-                
-                atom_groups[key].append((atom_block, alt_loc))
-                
-            else:
-                other_lines.append(line)
-            
-            i += 1
-        
-        # Select best conformation for each atom
-        cleaned_atom_blocks = []
-        alt_conf_resolved = 0
-        
-        for key, atom_list in atom_groups.items():
-            if len(atom_list) == 1:
-                # No alternative conformations - just add the block
-                cleaned_atom_blocks.extend(atom_list[0][0])
-            else:
-                # Multiple conformations - select highest occupancy
-                best_block = self._select_best_conformation_block(atom_list)
-                cleaned_atom_blocks.extend(best_block)
-                alt_conf_resolved += len(atom_list) - 1
-        
-        if alt_conf_resolved > 0:
-            self.logger.info(f"Resolved {alt_conf_resolved} alternative conformations")
-        
-        # Combine other lines with cleaned atom blocks
-        # Keep original order by inserting atoms at first ATOM/HETATM position
-        result_lines = []
-        atom_lines_inserted = False
-        
-        for line in other_lines:
-            if not atom_lines_inserted and line.startswith(('ATOM', 'HETATM')):
-                result_lines.extend(cleaned_atom_blocks)
-                atom_lines_inserted = True
-            elif not line.startswith(('ATOM', 'HETATM', 'ANISOU')):
-                result_lines.append(line)
-        
-        # If no ATOM/HETATM lines in other_lines, append at end
-        if not atom_lines_inserted:
-            result_lines.extend(cleaned_atom_blocks)
-        
-        return result_lines
+        # Line offsets: [starts, ends) includes the newline, [starts, stops) does not
+        ends = np.flatnonzero(raw == 10) + 1
+        if ends.size == 0 or ends[-1] != raw.size:
+            ends = np.append(ends, raw.size)
+        starts = np.concatenate(([0], ends[:-1]))
+        stops = ends - (raw[ends - 1] == 10)
+        n_lines = len(starts)
+        
+        record = _fixed_columns(raw, starts, stops, range(6)).view('S6').ravel()
+        is_atom = (record == ATOM_RECORDS[0]) | (record == ATOM_RECORDS[1])
+        is_anisou = record == b'ANISOU'
+        
+        atom_lines = np.flatnonzero(is_atom)
+        n_atoms = len(atom_lines)
+        if n_atoms == 0:
+            return self._iter_records(buffer, starts, ends, np.zeros(n_lines, dtype=bool), np.full(n_lines, -1)), 0, 0
+        
+        atom_starts = starts[atom_lines]
+        atom_stops = stops[atom_lines]
+        key_columns = _fixed_columns(raw, atom_starts, atom_stops, ATOM_KEY_COLUMNS)
+        key = _pack_columns(key_columns)
+        res_name = np.ascontiguousarray(key_columns[:, 4:7]).view('S3').ravel()
+        alt_loc = _fixed_columns(raw, atom_starts, atom_stops, [16])[:, 0]
+        # Occupancies only need ordering; float32 represents every 6-column value distinctly
+        occupancy = _parse_floats(_fixed_columns(raw, atom_starts, atom_stops, range(54, 60)).view('S6').ravel(),
+                                  np.float32)
+        
+        # An ANISOU line directly after an atom with the same serial number
+        # belongs to that atom's block; serial fields are compared as packed
+        # integers rather than parsed, so hybrid-36 serials pair correctly
+        next_lines = np.minimum(atom_lines + 1, n_lines - 1)
+        candidates = np.flatnonzero((atom_lines + 1 < n_lines) & is_anisou[next_lines])
+        serial = _pack_columns(_fixed_columns(raw, atom_starts[candidates], atom_stops[candidates], range(6, 11)))
+        next_serial = _pack_columns(_fixed_columns(raw, starts[next_lines[candidates]], 
+                                                   stops[next_lines[candidates]], range(6, 11)))
+        paired = np.zeros(n_atoms, dtype=bool)
+        paired[candidates] = serial[:, 0] == next_serial[:, 0]
+        block_ends = np.where(paired, ends[next_lines], ends[atom_lines])
+        anisou_offsets = np.where(paired, ends[atom_lines] - atom_starts, -1)
+        
+        # Sort by (key, -occupancy); the sort is stable so ties keep the first
+        # conformer, and the first row of each key is the winner
+        order = np.lexsort((-occupancy,) + tuple(key[:, i] for i in reversed(range(key.shape[1]))))
+        sorted_key = key[order]
+        boundaries = np.flatnonzero(np.r_[True, (sorted_key[1:] != sorted_key[:-1]).any(axis=1)])
+        winners = order[boundaries]
+        group_sizes = np.diff(np.r_[boundaries, n_atoms])
+        
+        # Keep every line in file order except losing conformers; a kept atom
+        # record extends over its ANISOU line, and its alt_loc is cleared where
+        # it was chosen among several conformers
+        keep = np.ones(n_lines, dtype=bool)
+        keep[atom_lines] = False
+        keep[atom_lines[winners]] = True
+        keep[atom_lines[paired] + 1] = False
+        
+        record_ends = ends.copy()
+        record_ends[atom_lines] = block_ends
+        
+        anisou_offset = np.full(n_lines, -1)
+        anisou_offset[atom_lines] = anisou_offsets
+        
+        clear = np.zeros(n_lines, dtype=bool)
+        clear[atom_lines[winners]] = (group_sizes > 1) & (alt_loc[winners] != 32)
+        
+        alt_conf_resolved = n_atoms - len(winners)
+        if alt_conf_resolved > 0 and self.logger.isEnabledFor(logging.INFO):
+            self.logger.info("Resolved %d alternative conformations", alt_conf_resolved)
+        
+        # Drop winning HETATM records (with their ANISOU lines) of removed residues
+        category = self._removal_categories(res_name[winners], remove_waters, remove_ions, remove_ligands)
+        category[record[atom_lines[winners]] != b'HETATM'] = -1
+        removed = category >= 0
+        keep[atom_lines[winners[removed]]] = False
+        
+        removed_counts = np.bincount(category[removed], minlength=len(REMOVAL_CATEGORIES))
+        # Report all categories in one record, formatted only when INFO is enabled
+        if removed_counts.any() and self.logger.isEnabledFor(logging.INFO):
+            waters, ions, ligands = removed_counts.tolist()
+            self.logger.info("Removed %d waters, %d ions, %d ligands", waters, ions, ligands)
+        
+        kept = np.flatnonzero(keep)
+        records = self._iter_records(buffer, starts[kept], record_ends[kept], clear[kept], anisou_offset[kept])
+        return records, n_atoms, len(winners) - int(removed_counts.sum())
     
-    def _select_best_conformation_block(self, atom_list: List[Tuple[List[str], str]]) -> List[str]:
+    def _iter_records(self, buffer, starts: np.ndarray, ends: np.ndarray,
+                      clear: np.ndarray, anisou_offset: np.ndarray) -> Iterator[bytes]:
         """
-        Select the best conformation block from alternative conformations
+        Yield records from the buffer, clearing alt_loc where requested
+        
+        Runs of unmodified records that are contiguous in the buffer are
+        yielded as a single slice.
         
         Args:
-            atom_list: List of (block_lines, alt_loc) tuples where block_lines contains ATOM and optionally ANISOU
+            buffer: PDB file contents
+            starts: Start offset of each record
+            ends: End offset of each record
+            clear: Whether to clear the record's alt_loc column
+            anisou_offset: Offset of the record's ANISOU line within it, or -1
             
-        Returns:
-            Best block of PDB lines with alt_loc cleared
+        Yields:
+            Record bytes
         """
-        # Parse occupancies and select highest
-        best_block = atom_list[0][0]
-        best_occupancy = 0.0
-        best_alt_loc = atom_list[0][1]
-        
-        for block_lines, alt_loc in atom_list:
-            # Get occupancy from the ATOM/HETATM line (first line in block)
-            atom_line = block_lines[0]
-            try:
-                occupancy = float(atom_line[54:60])
-                if occupancy > best_occupancy:
-                    best_occupancy = occupancy
-                    best_block = block_lines
-                    best_alt_loc = alt_loc
-            except (ValueError, IndexError):
-                # If occupancy can't be parsed, keep first one
-                continue
-        
-        # Clear alternative location indicator from all lines in the block
-        cleaned_block = []
-        for line in best_block:
-            if best_alt_loc and line.startswith(('ATOM', 'HETATM', 'ANISOU')):
-                # Clear alt_loc (position 16)
-                cleaned_line = line[:16] + ' ' + line[17:]
-                cleaned_block.append(cleaned_line)
-            else:
-                cleaned_block.append(line)
-        
-        return cleaned_block
+        if len(starts) == 0:
+            return
+        
+        # A run breaks where records are not adjacent or around a modified record
+        breaks = np.ones(len(starts), dtype=bool)
+        breaks[1:] = (starts[1:] != ends[:-1]) | clear[1:] | clear[:-1]
+        first_records = np.flatnonzero(breaks)
+        last_records = np.r_[first_records[1:], len(starts)] - 1
+        starts, ends = starts[first_records], ends[last_records]
+        clear, anisou_offset = clear[first_records], anisou_offset[first_records]
+        
+        for first in range(0, len(starts), WRITE_CHUNK_LINES):
+            chunk = slice(first, first + WRITE_CHUNK_LINES)
+            for start, end, clear_alt_loc, offset in zip(starts[chunk].tolist(), ends[chunk].tolist(),
+                                                         clear[chunk].tolist(), anisou_offset[chunk].tolist()):
+                record = buffer[start:end]
+                if clear_alt_loc:
+                    record = bytearray(record)
+                    record[16] = 32
+                    if offset >= 0:
+                        record[offset + 16] = 32
+                    record = bytes(record)
+                yield record
     
-    def _filter_records(self, lines: List[str], remove_waters: bool,
-                       remove_ions: bool, remove_ligands: bool) -> List[str]:
+    def _removal_categories(self, res_names: np.ndarray, remove_waters: bool,
+                            remove_ions: bool, remove_ligands: bool) -> np.ndarray:
         """
-        Filter out unwanted records based on options
+        Classify HETATM residue names by the removal filters
         
         Args:
-            lines: List of PDB lines
+            res_names: 3-byte residue name fields
             remove_waters: Remove water molecules
             remove_ions: Remove ions
             remove_ligands: Remove non-protein ligands
             
         Returns:
-            Filtered list of lines
+            Index into REMOVAL_CATEGORIES for each removed residue, -1 where kept
         """
-        filtered_lines = []
-        removed_counts = defaultdict(int)
+        waters = _residue_field_variants(self.water_residues)
+        ions = _residue_field_variants(self.common_ions)
+        is_water = np.isin(res_names, list(waters))
+        is_ion = np.isin(res_names, list(ions))
         
-        for line in lines:
-            keep_line = True
-            
-            if line.startswith('HETATM'):
-                res_name = line[17:20].strip()
-                
-                # Check for waters
-                if remove_waters and res_name in ('HOH', 'WAT', 'H2O', 'TIP', 'SOL'):
-                    keep_line = False
-                    removed_counts['waters'] += 1
-                
-                # Check for ions
-                elif remove_ions and res_name in self.common_ions:
-                    keep_line = False
-                    removed_counts['ions'] += 1
-                
-                # Check for ligands (everything else that's not protein)
-                elif remove_ligands and res_name not in self.standard_residues:
-                    # Don't remove if it's water or ion (handled above)
-                    if not (res_name in ('HOH', 'WAT', 'H2O', 'TIP', 'SOL') or 
-                           res_name in self.common_ions):
-                        keep_line = False
-                        removed_counts['ligands'] += 1
-            
-            if keep_line:
-                filtered_lines.append(line)
-        
-        # Report what was removed
-        for category, count in removed_counts.items():
-            if count > 0:
-                self.logger.info(f"Removed {count} {category}")
-        
-        return filtered_lines
+        # Ligands are whatever is not protein, water or ion
+        category = np.full(len(res_names), -1, dtype=np.intp)
+        if remove_ligands:
+            standard = _residue_field_variants(self.standard_residues)
+            category[~(is_water | is_ion | np.isin(res_names, list(standard)))] = REMOVAL_CATEGORIES.index('ligands')
+        if remove_ions:
+            category[is_ion] = REMOVAL_CATEGORIES.index('ions')
+        if remove_waters:
+            category[is_water] = REMOVAL_CATEGORIES.index('waters')
+        return category
     
-    def _report_cleaning_stats(self, original_lines: List[str], 
-                              cleaned_lines: List[str]) -> None:
+    def _report_cleaning_stats(self, original_atoms: int, cleaned_atoms: int) -> None:
         """Report statistics about the cleaning process"""
         
-        original_atoms = sum(1 for line in original_lines 
-                           if line.startswith(('ATOM', 'HETATM')))
-        cleaned_atoms = sum(1 for line in cleaned_lines 
-                          if line.startswith(('ATOM', 'HETATM')))
-        
         self.logger.info(f"Original atoms: {original_atoms}")
         self.logger.info(f"Cleaned atoms: {cleaned_atoms}")
         self.logger.info(f"Atoms removed: {original_atoms - cleaned_atoms}")
@@ -5,11 +5,30 @@ Handles conversion of docking results for web visualization using 3Dmol.js
 """
 
 import os
-import json
+import gzip
+import base64
+import hashlib
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Any, Optional
-import base64
+from .json_encoding import to_script_json
+
+# PDBQT records kept when converting to PDB (record names with trailing blanks removed)
+PDB_COORDINATE_RECORDS = frozenset({b'ATOM', b'HETATM'})
+PDB_KEPT_RECORDS = frozenset({b'END', b'ENDMDL', b'CONECT', b'MASTER', b'HEADER'})
+
+# Structure data larger than this (in bytes of JSON) is embedded gzip-compressed
+STRUCTURE_DATA_COMPRESS_MIN_BYTES = 64 * 1024
+
+
+def _first_model(pdb_content: str) -> str:
+    """Return multi-model PDB text up to and including its first ENDMDL record"""
+    end = pdb_content.find('\nENDMDL')
+    if end < 0:
+        return pdb_content
+    end = pdb_content.find('\n', end + 1)
+    return pdb_content if end < 0 else pdb_content[:end]
 
 
 class StructureViewer:
@@ -37,24 +56,7 @@ class StructureViewer:
             PDB content as string
         """
         try:
-            with open(pdbqt_file, 'r') as f:
-                pdbqt_content = f.read()
-            
-            # Convert PDBQT to PDB by removing AutoDock-specific lines
-            pdb_lines = []
-            for line in pdbqt_content.split('\n'):
-                # Keep coordinate lines and essential PDB records
-                if (line.startswith(('ATOM', 'HETATM', 'END', 'CONECT', 'MASTER', 'HEADER')) 
-                    and not line.startswith(('ROOT', 'ENDROOT', 'BRANCH', 'ENDBRANCH', 'TORSDOF'))):
-                    # Remove AutoDock specific columns (charges, atom types)
-                    if line.startswith(('ATOM', 'HETATM')):
-                        # Keep standard PDB format (first 66 characters)
-                        pdb_line = line[:66].ljust(66) + '\n'
-                        pdb_lines.append(pdb_line.rstrip())
-                    else:
-                        pdb_lines.append(line)
-            
-            pdb_content = '\n'.join(pdb_lines)
+            pdb_content = self._convert_pdbqt(pdbqt_file)
             
             # Write to file if requested
             if output_pdb:
@@ -68,6 +70,34 @@ class StructureViewer:
             self.logger.error(f"Error converting {pdbqt_file} to PDB: {e}")
             return ""
     
+    @staticmethod
+    def _convert_pdbqt(pdbqt_file: str) -> str:
+        """
+        Convert a PDBQT file to PDB text
+        
+        Args:
+            pdbqt_file: Path to PDBQT file
+            
+        Returns:
+            PDB content as string
+        """
+        with open(pdbqt_file, 'rb') as f:
+            pdbqt_content = f.read()
+        
+        # Convert PDBQT to PDB by removing AutoDock-specific lines
+        # (ROOT, ENDROOT, BRANCH, ENDBRANCH, TORSDOF, ...)
+        pdb_lines = []
+        for line in pdbqt_content.splitlines():
+            record = line[:6].rstrip()
+            if record in PDB_COORDINATE_RECORDS:
+                # Remove AutoDock specific columns (charges, atom types),
+                # keeping the standard PDB format (first 66 characters)
+                pdb_lines.append(line[:66].rstrip())
+            elif record in PDB_KEPT_RECORDS:
+                pdb_lines.append(line)
+        
+        return b'\n'.join(pdb_lines).decode()
+    
     def prepare_receptor_for_viewing(self, receptor_pdbqt: str) -> str:
         """
         Prepare receptor structure for 3D viewing
@@ -95,16 +125,22 @@ class StructureViewer:
         
         output_dir = Path(self.config.get('docking.output_dir', 'docking_results'))
         
-        # Find receptor file (should be in temp directory, but let's create a copy)
-        receptor_files = list(output_dir.glob('*receptor*.pdbqt'))
+        # Find receptor file (should be in temp directory, but let's create a copy);
+        # stop at the first *receptor*.pdbqt entry
+        receptor_file = None
+        try:
+            with os.scandir(output_dir) as entries:
+                receptor_file = next((entry.path for entry in entries
+                                      if 'receptor' in entry.name and entry.name.endswith('.pdbqt')), None)
+        except OSError:
+            pass
         receptor_pdb_content = ""
         
-        if not receptor_files:
+        if receptor_file is None:
             # Try to recreate receptor if needed
             self.logger.warning("No receptor file found in docking results")
         else:
-            # Use the first receptor file found
-            receptor_pdb_content = self.convert_pdbqt_to_pdb(str(receptor_files[0]))
+            receptor_pdb_content = self.convert_pdbqt_to_pdb(receptor_file)
         
         # Prepare ligand structures
         structure_data = {
@@ -113,25 +149,70 @@ class StructureViewer:
             'docking_scores': {}
         }
         
-        for result in docking_data:
+        # Optionally move the receptor out of the page into a cacheable asset
+        if receptor_pdb_content and self.config.get('visualization.docking_plots.external_receptor', False):
+            receptor_url = self._write_receptor_asset(receptor_pdb_content)
+            if receptor_url:
+                structure_data['receptor'] = ""
+                structure_data['receptor_url'] = receptor_url
+        
+        results = [result for result in docking_data
+                   if result.get('pose_file') and Path(result['pose_file']).exists()]
+        
+        # Convert ligand poses to PDB; the reads are independent and I/O bound,
+        # so overlap them on a thread pool
+        pose_files = [result['pose_file'] for result in results]
+        n_workers = min(32, (os.cpu_count() or 1) * 4, len(pose_files))
+        if n_workers > 1:
+            with ThreadPoolExecutor(max_workers=n_workers) as executor:
+                ligand_pdbs = list(executor.map(self.convert_pdbqt_to_pdb, pose_files))
+        else:
+            ligand_pdbs = [self.convert_pdbqt_to_pdb(pose_file) for pose_file in pose_files]
+        
+        for result, ligand_pdb in zip(results, ligand_pdbs):
             compound_id = result.get('compound_id', 0)
             compound_name = result.get('compound_name', f"Compound_{compound_id}")
-            pose_file = result.get('pose_file', '')
             docking_score = result.get('docking_score', 0.0)
             
-            if pose_file and Path(pose_file).exists():
-                # Convert ligand pose to PDB
-                ligand_pdb = self.convert_pdbqt_to_pdb(pose_file)
-                structure_data['ligands'][compound_id] = {
-                    'name': compound_name,
-                    'pdb_content': ligand_pdb,
-                    'docking_score': docking_score
-                }
-                structure_data['docking_scores'][compound_id] = docking_score
+            # Vina writes every binding mode (best first); the viewer loads only
+            # the first model, so the remaining modes are not embedded
+            structure_data['ligands'][compound_id] = {
+                'name': compound_name,
+                'pdb_content': _first_model(ligand_pdb),
+                'docking_score': docking_score
+            }
+            structure_data['docking_scores'][compound_id] = docking_score
         
         self.logger.info(f"Prepared {len(structure_data['ligands'])} structures for viewing")
         return structure_data
     
+    def _write_receptor_asset(self, receptor_pdb_content: str) -> Optional[str]:
+        """
+        Write receptor PDB content to a script file next to the dashboard
+        
+        The file name carries a hash of the content, so browsers can cache it
+        across dashboards and reloads; loading it with a <script> element also
+        works for dashboards opened from the local file system.
+        
+        Args:
+            receptor_pdb_content: Receptor structure in PDB format
+            
+        Returns:
+            Asset URL relative to the dashboard, or None if it could not be written
+        """
+        try:
+            digest = hashlib.sha1(receptor_pdb_content.encode()).hexdigest()[:16]
+            asset_name = f"receptor.{digest}.js"
+            asset_path = Path(self.config.get_output_file()).parent / asset_name
+            if not asset_path.exists():
+                asset_path.parent.mkdir(parents=True, exist_ok=True)
+                asset_path.write_text(f"window.receptorPdb = {to_script_json(receptor_pdb_content)};\n")
+                self.logger.info(f"Receptor structure written to: {asset_path}")
+            return asset_name
+        except Exception as e:
+            self.logger.warning(f"Could not write receptor asset, embedding receptor instead: {e}")
+            return None
+    
     def encode_structure_data(self, structure_data: Dict[str, Any]) -> str:
         """
         Encode structure data for embedding in HTML
@@ -140,15 +221,13 @@ class StructureViewer:
             structure_data: Structure data dictionary
             
         Returns:
-            Base64 encoded JSON string
+            JSON string safe to embed in a <script type="application/json"> element
         """
         try:
-            json_data = json.dumps(structure_data)
-            encoded_data = base64.b64encode(json_data.encode()).decode()
-            return encoded_data
+            return to_script_json(structure_data)
         except Exception as e:
             self.logger.error(f"Error encoding structure data: {e}")
-            return ""
+            return "{}"
     
     def generate_3dmol_html(self, structure_data: Dict[str, Any]) -> str:
         """
@@ -160,8 +239,17 @@ class StructureViewer:
         Returns:
             HTML content for 3D viewer
         """
-        # Encode data for JavaScript
+        # Encode data for JavaScript; large payloads (PDB text compresses well)
+        # are gzipped and inflated in the browser with DecompressionStream
         encoded_data = self.encode_structure_data(structure_data)
+        data_type = 'application/json'
+        if len(encoded_data) > STRUCTURE_DATA_COMPRESS_MIN_BYTES:
+            encoded_data = base64.b64encode(gzip.compress(encoded_data.encode(), compresslevel=6)).decode()
+            data_type = 'application/gzip'
+        
+        # Receptor written to a separate asset is loaded before the viewer script
+        receptor_url = structure_data.get('receptor_url')
+        receptor_script = f'<script src="{receptor_url}"></script>' if receptor_url else ''
         
         html_content = f"""
         <div id="structure-viewer-container">
@@ -181,32 +269,42 @@ class StructureViewer:
             </div>
         </div>
         
+        {receptor_script}
+        <script id="structure-data" type="{data_type}">{encoded_data}</script>
         <script>
-            // Structure data (base64 encoded)
-            const structureDataEncoded = '{encoded_data}';
             let structureData = {{}};
             
-            // Decode structure data
-            try {{
-                const decodedData = atob(structureDataEncoded);
-                structureData = JSON.parse(decodedData);
-            }} catch (e) {{
-                console.error('Error decoding structure data:', e);
+            // Parse structure data (base64-encoded gzip for large payloads)
+            async function loadStructureData() {{
+                const element = document.getElementById('structure-data');
+                if (element.type !== 'application/gzip') {{
+                    return JSON.parse(element.textContent);
+                }}
+                const bytes = Uint8Array.from(atob(element.textContent), c => c.charCodeAt(0));
+                const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+                return await new Response(stream).json();
             }}
             
+            const structureDataReady = loadStructureData()
+                .then(data => {{ structureData = data; }})
+                .catch(e => console.error('Error decoding structure data:', e));
+            
             // Initialize 3Dmol viewer
             let viewer = null;
             let currentLigand = null;
             let showSurface = false;
             
-            function initializeViewer() {{
+            async function initializeViewer() {{
+                await structureDataReady;
+                
                 const element = $('#structure-viewer');
                 const config = {{ backgroundColor: 'white' }};
                 viewer = $3Dmol.createViewer(element, config);
                 
-                // Load receptor if available
-                if (structureData.receptor) {{
-                    viewer.addModel(structureData.receptor, 'pdb');
+                // Load receptor if available (embedded, or from the receptor asset)
+                const receptor = structureData.receptor || window.receptorPdb;
+                if (receptor) {{
+                    viewer.addModel(receptor, 'pdb');
                     viewer.setStyle({{model: 0}}, {{
                         cartoon: {{ 
                             color: 'spectrum',
@@ -221,7 +319,7 @@ class StructureViewer:
                     const ligand = structureData.ligands[ligandId];
                     const option = document.createElement('option');
                     option.value = ligandId;
-                    option.textContent = `${{ligand.name}} (${{ligand.docking_score.toFixed(1)}} kcal/mol)`;
+                    option.textContent = `${{ligand.name}} (${{ligand.docking_score != null ? ligand.docking_score.toFixed(1) : 'N/A'}} kcal/mol)`;
                     selector.appendChild(option);
                 }});
                 
@@ -230,7 +328,7 @@ class StructureViewer:
             }}
             
             function showLigand(ligandId) {{
-                if (!viewer || !structureData.ligands[ligandId]) return;
+                if (!viewer || !(structureData.ligands || {{}})[ligandId]) return;
                 
                 // Remove previous ligand
                 if (currentLigand !== null) {{
@@ -263,7 +361,7 @@ class StructureViewer:
                 const energyDisplay = document.getElementById('binding-energy-display');
                 energyDisplay.innerHTML = `
                     <strong>${{ligand.name}}</strong><br>
-                    Docking Score: <span style="color: #4CAF50;">${{ligand.docking_score.toFixed(1)}} kcal/mol</span>
+                    Docking Score: <span style="color: #4CAF50;">${{ligand.docking_score != null ? ligand.docking_score.toFixed(1) : 'N/A'}} kcal/mol</span>
                 `;
                 
                 currentLigand = ligandId;
@@ -0,0 +1,49 @@
+"""Tests for MolecularDataProcessor input loading"""
+
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("rdkit")
+
+from mol_view_dashboard import ConfigManager, MolecularDataProcessor
+
+
+def make_processor(**settings):
+    """Processor on the default configuration with dot-path overrides"""
+    config = ConfigManager()
+    for key_path, value in settings.items():
+        config.set(key_path, value)
+    return MolecularDataProcessor(config)
+
+
+def test_read_csv_accepts_ragged_rows_and_blank_headers(tmp_path):
+    csv_file = tmp_path / "input.csv"
+    csv_file.write_text("SMILES,Name,,Activity\n"
+                        "CCO,a,x,1.0\n"
+                        "c1ccccc1,b,y\n")
+
+    df = make_processor().load_and_process_data(str(csv_file))
+
+    assert list(df.columns[:4]) == ['SMILES', 'Name', 'Unnamed: 2', 'Activity']
+    assert df['title'].tolist() == ['a', 'b']
+    assert df['Activity'].isna().tolist() == [False, True]
+
+
+@pytest.mark.parametrize('cases', [
+    ['CCO', 'CCO extra', 'c1ccccc1 benzene', 'C C', ' CCN', 'CCN ', '', 'not_a_smiles', None, 'C1CC'],
+    ['CCO', 'c1ccccc1\tbenzene', 'CCN\t', 'C C'],
+])
+def test_parallel_smiles_parsing_matches_serial(cases, caplog):
+    from rdkit import Chem
+    from mol_view_dashboard.molecular_data_processor import PARALLEL_PARSE_MIN_COMPOUNDS
+
+    smiles_list = cases * (PARALLEL_PARSE_MIN_COMPOUNDS // len(cases) + 1)
+    serial = make_processor(**{'performance.n_jobs': 1})._parse_smiles(smiles_list)
+    parallel = make_processor(**{'performance.n_jobs': 4})._parse_smiles(smiles_list)
+
+    def canonical(mols):
+        return [None if mol is None else Chem.MolToSmiles(mol) for mol in mols]
+
+    assert canonical(parallel) == canonical(serial)
+    assert [mol is None for mol in parallel] == [mol is None for mol in serial]
+    assert 'falling back to serial' not in caplog.text